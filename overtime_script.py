@@ -11,7 +11,6 @@ Included sources:
 Excluded from this simplified version:
   - Slack channel enumeration & per-channel caching / membership filtering
   - Google Calendar CSV legacy parsing
-  - Advanced Slack range coverage logic
 
 Outputs:
   - extra_commits.csv  (detailed evidence rows)
@@ -21,6 +20,7 @@ Environment variables (load from .env if present):
   SINCE, UNTIL (YYYY-MM-DD bounds)
   MY_EMAILS=mail1,mail2
   REPOS_ROOT=path/to/repos (defaults to HOME)
+  GIT_JOBS=N (parallel git log workers, defaults to CPU count)
   USE_BITBUCKET=true|false
   BITBUCKET_USER, BITBUCKET_APP_PASSWORD, BITBUCKET_WORKSPACE, BITBUCKET_REPO_SLUGS=repo1,repo2
   GOOGLE_CALENDAR_ICS=/path/to/export.ics
@@ -39,17 +39,24 @@ from dotenv import load_dotenv
 load_dotenv()
 
 import csv
+import gzip
 import subprocess
 import re
 import json
 import base64
-import urllib.request
+import http.client
+import urllib.error
 import urllib.parse
 import random
 import time as time_module
+import heapq
+from bisect import bisect_right
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, time, timezone
 from pathlib import Path
 from collections import defaultdict
+from itertools import chain, groupby, islice
+from functools import lru_cache
 
 try:
     from zoneinfo import ZoneInfo
@@ -59,6 +66,10 @@ try:
     import holidays as pyholidays
 except ImportError:
     pyholidays = None
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 # -----------------------------
 # CONFIG
@@ -66,6 +77,10 @@ except ImportError:
 SINCE = os.getenv("SINCE", "2024-05-01")
 UNTIL = os.getenv("UNTIL", "2025-08-30")
 REPOS_ROOT = os.getenv("REPOS_ROOT", str(Path.home()))
+try:
+    GIT_JOBS = max(1, int(os.getenv("GIT_JOBS", "0") or 0) or os.cpu_count() or 1)
+except ValueError:
+    GIT_JOBS = os.cpu_count() or 1
 OUT_COMMITS_CSV = "extra_commits.csv"
 OUT_SUMMARY_CSV = "extra_summary.csv"
 
@@ -74,6 +89,7 @@ BITBUCKET_USER = os.getenv("BITBUCKET_USER")
 BITBUCKET_APP_PASSWORD = os.getenv("BITBUCKET_APP_PASSWORD")
 BITBUCKET_WORKSPACE = os.getenv("BITBUCKET_WORKSPACE", "")
 BITBUCKET_REPO_SLUGS = [r.strip() for r in os.getenv("BITBUCKET_REPO_SLUGS", "").split(",") if r.strip()]
+BITBUCKET_CACHE_DIR = Path(os.getenv("BITBUCKET_CACHE_DIR", ".bb_cache"))
 
 GOOGLE_CALENDAR_ICS = os.getenv("GOOGLE_CALENDAR_ICS")
 
@@ -85,8 +101,11 @@ SLACK_FORCE_REFRESH = os.getenv("SLACK_FORCE_REFRESH", "false").lower() in ("1",
 SLACK_CACHE_DIR = Path(os.getenv("SLACK_CACHE_DIR", ".slack_cache"))
 
 LOCAL_TZ = os.getenv("LOCAL_TZ", "America/New_York")
-MY_EMAILS = {e.strip().lower() for e in os.getenv("MY_EMAILS", "").split(",") if e.strip()}
+TZ = ZoneInfo(LOCAL_TZ) if ZoneInfo else None
+MY_EMAILS = frozenset(e.strip().lower() for e in os.getenv("MY_EMAILS", "").split(",") if e.strip())
 EXCLUDE_COMMIT_MSG_RE = re.compile(r"\b(merge pull request|dependabot|bump version|chore:?)\b", re.I)
+# Plain substrings of the regex alternatives; a cheap prefilter so the regex only runs on likely hits
+EXCLUDE_COMMIT_KEYWORDS = ("merge pull request", "dependabot", "bump version", "chore")
 
 # Work schedule windows per weekday (0=Mon .. 6=Sun) now configurable via env vars.
 # Environment variables:
@@ -136,7 +155,9 @@ if WEEKENDS_COUNT_AS_EXTRA:
 
 HOLIDAYS_COUNTRY = os.getenv("HOLIDAYS_COUNTRY", "US")
 HOLIDAYS_PROV = os.getenv("HOLIDAYS_PROV", "NY")
-HOLIDAYS = (pyholidays.country_holidays(HOLIDAYS_COUNTRY, subdiv=HOLIDAYS_PROV) if pyholidays else set())
+# Years are expanded up front so HOLIDAYS can be frozen into a plain date set
+_holiday_years = range(int(SINCE[:4]), int(UNTIL[:4]) + 2)
+_holidays = (pyholidays.country_holidays(HOLIDAYS_COUNTRY, subdiv=HOLIDAYS_PROV, years=_holiday_years) if pyholidays else {})
 
 EXCLUDED_CALENDAR_TITLES = {t.strip().lower() for t in os.getenv(
     "EXCLUDED_CALENDAR_TITLES",
@@ -149,16 +170,15 @@ for d_str in PTO_DAYS_STR:
         PTO_DAYS.add(datetime.fromisoformat(d_str).date())
     except Exception:
         pass
-for d in PTO_DAYS:
-    HOLIDAYS[d] = "PTO"
+HOLIDAYS = frozenset(_holidays) | PTO_DAYS
 
 # -----------------------------
 # UTILITIES
 # -----------------------------
 def to_local(dt: datetime) -> datetime:
     if dt.tzinfo is None:
-        return dt.replace(tzinfo=ZoneInfo(LOCAL_TZ))
-    return dt.astimezone(ZoneInfo(LOCAL_TZ))
+        return dt.replace(tzinfo=TZ)
+    return dt.astimezone(TZ)
 
 def parse_iso_local(dt_str: str):
     try:
@@ -172,10 +192,14 @@ def parse_iso_local(dt_str: str):
             except Exception:
                 return None
 
+@lru_cache(maxsize=16)
+def _work_windows(weekday, is_holiday):
+    if is_holiday or not SHIFT_WINDOWS.get(weekday):
+        return ()
+    return tuple(SHIFT_WINDOWS[weekday])
+
 def day_work_windows(d):
-    if (d in HOLIDAYS) or not SHIFT_WINDOWS.get(d.weekday()):
-        return []
-    return SHIFT_WINDOWS[d.weekday()]
+    return _work_windows(d.weekday(), d in HOLIDAYS)
 
 def merge_intervals(intervals):
     if not intervals:
@@ -190,15 +214,15 @@ def merge_intervals(intervals):
             merged.append((s,e))
     return merged
 
+@lru_cache(maxsize=4096)
 def outside_segments_for_day(d):
-    tz = ZoneInfo(LOCAL_TZ)
-    full_start = datetime.combine(d, time(0,0), tzinfo=tz)
-    full_end = datetime.combine(d, time(23,59,59), tzinfo=tz)
+    full_start = datetime.combine(d, time(0,0), tzinfo=TZ)
+    full_end = datetime.combine(d, time(23,59,59), tzinfo=TZ)
     windows = day_work_windows(d)
     if not windows:
-        return [(full_start, full_end)]
+        return ((full_start, full_end),)
     inside = [
-        (datetime.combine(d, s, tzinfo=tz), datetime.combine(d, e, tzinfo=tz))
+        (datetime.combine(d, s, tzinfo=TZ), datetime.combine(d, e, tzinfo=TZ))
         for s,e in windows
     ]
     inside = merge_intervals(inside)
@@ -210,25 +234,32 @@ def outside_segments_for_day(d):
         cursor = max(cursor, e)
     if cursor < full_end:
         outside.append((cursor, full_end))
-    return outside
-
-def intersect_interval_with_outside(start: datetime, end: datetime):
+    return tuple(outside)
+
+# Sorted, merged outside-work segments for first_day..last_day plus their start keys (for bisect)
+def outside_timeline(first_day, last_day):
+    segments = []
+    d = first_day
+    while d <= last_day:
+        segments.extend(outside_segments_for_day(d))
+        d += timedelta(days=1)
+    segments = merge_intervals(segments)
+    return segments, [s for s,_ in segments]
+
+def intersect_interval_with_outside(start: datetime, end: datetime, timeline=None):
+    if timeline is None:
+        timeline = outside_timeline(start.date(), end.date())
+    segments, starts = timeline
     out = []
-    cur = start
-    while cur.date() <= end.date():
-        day = cur.date()
-        day_start = datetime.combine(day, time(0,0), tzinfo=start.tzinfo)
-        day_end = datetime.combine(day, time(23,59,59), tzinfo=start.tzinfo)
-        seg_start = max(start, day_start)
-        seg_end = min(end, day_end)
-        if seg_start < seg_end:
-            for os, oe in outside_segments_for_day(day):
-                s = max(seg_start, os)
-                e = min(seg_end, oe)
-                if s < e:
-                    out.append((s,e))
-        cur = day_end + timedelta(seconds=1)
-    return merge_intervals(out)
+    # Segments don't overlap, so only the one starting at/before `start` can straddle it
+    i = max(0, bisect_right(starts, start) - 1)
+    while i < len(segments) and segments[i][0] < end:
+        s = max(start, segments[i][0])
+        e = min(end, segments[i][1])
+        if s < e:
+            out.append((s,e))
+        i += 1
+    return out
 
 def sessions_from_points(points, gap_min=45, pad_before_min=10, pad_after_min=15):
     if not points:
@@ -248,152 +279,312 @@ def sessions_from_points(points, gap_min=45, pad_before_min=10, pad_after_min=15
 # -----------------------------
 # GIT COMMITS
 # -----------------------------
-def find_git_repos(root: str):
-    for dirpath, dirnames, filenames in os.walk(root):
-        if ".git" in dirnames:
-            yield dirpath
-            dirnames[:] = [d for d in dirnames if d != ".git"]
+# Directory names never descended into while looking for repositories.
+REPO_SCAN_PRUNE = {"node_modules", ".venv", "venv", "__pycache__", ".tox", ".cache", "target", "build", "dist"}
 
-def collect_git_commits():
-    if not MY_EMAILS:
-        print("MY_EMAILS empty; skipping git commits")
-        return []
-    rows = []
-    since_dt = parse_iso_local(SINCE+"T00:00:00")
-    until_dt = parse_iso_local(UNTIL+"T23:59:59")
-    for repo in find_git_repos(REPOS_ROOT):
+def find_git_repos(root: str):
+    # scandir exposes the entry type without a stat per file; stop at the first .git
+    stack = [root]
+    while stack:
+        d = stack.pop()
         try:
-            cmd = [
-                "git", "-C", repo, "log",
-                f"--since={SINCE}", f"--until={UNTIL}",
-                "--no-merges",
-                "--pretty=format:%H|%an|%ae|%cI|%s"
-            ]
-            out = subprocess.check_output(cmd, text=True, stderr=subprocess.DEVNULL)
-        except subprocess.CalledProcessError:
+            it = os.scandir(d)
+        except OSError:
             continue
-        for line in out.splitlines():
-            try:
-                sha, author_name, author_email, ciso, subject = line.split("|", 4)
-            except ValueError:
-                continue
-            if author_email.lower() not in MY_EMAILS:
+        subdirs = []
+        is_repo = False
+        with it:
+            for entry in it:
+                try:
+                    if not entry.is_dir(follow_symlinks=False):
+                        continue
+                except OSError:
+                    continue
+                name = entry.name
+                if name == ".git":
+                    is_repo = True
+                    break
+                if name in REPO_SCAN_PRUNE:
+                    continue
+                subdirs.append(entry.path)
+        if is_repo:
+            yield d
+            continue
+        stack.extend(subdirs)
+
+def _iter_nul_records(stream, chunk_size=1 << 16):
+    # Yield NUL-terminated records from a binary stream as they arrive
+    pending = b""
+    for chunk in iter(lambda: stream.read1(chunk_size), b""):
+        records = (pending + chunk).split(b"\x00")
+        pending = records.pop()
+        yield from records
+    if pending:
+        yield pending
+
+def _log_one_repo(repo, since_dt, until_dt):
+    rows = []
+    cmd = [
+        "git", "-C", repo, "log",
+        f"--since={SINCE}", f"--until={UNTIL}",
+        "--no-merges", "--no-decorate", "--no-renames", "-z",
+        # Unit-separated fields; -z terminates each record with NUL
+        "--pretty=tformat:%H%x1f%ct%x1f%s",
+        # Let git filter by author: repeated --author patterns are OR'ed, matched
+        # as fixed strings against the "<email>" part of the author header
+        "--fixed-strings", "--regexp-ignore-case",
+        *(f"--author=<{e}>" for e in sorted(MY_EMAILS)),
+    ]
+    # Stream stdout instead of buffering the whole log; %ct avoids ISO parsing
+    with subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, bufsize=1 << 20) as proc:
+        for record in _iter_nul_records(proc.stdout):
+            if not record:
                 continue
-            if EXCLUDE_COMMIT_MSG_RE.search(subject):
+            sha, ct, subject = record.decode("utf-8", "replace").split("\x1f", 2)
+            subject_lower = subject.lower()
+            if any(k in subject_lower for k in EXCLUDE_COMMIT_KEYWORDS) and EXCLUDE_COMMIT_MSG_RE.search(subject):
                 continue
-            dt = parse_iso_local(ciso)
-            if not dt or dt < since_dt or dt > until_dt:
+            dt = datetime.fromtimestamp(int(ct), tz=TZ)
+            if dt < since_dt or dt > until_dt:
                 continue
             rows.append({
                 "source": "git",
                 "repo": os.path.relpath(repo, REPOS_ROOT),
                 "timestamp_local": dt.isoformat(),
+                "dt": dt,
                 "detail": f"commit {sha[:7]}: {subject}",
             })
+    if proc.returncode != 0:
+        return []
+    return rows
+
+def collect_git_commits():
+    if not MY_EMAILS:
+        print("MY_EMAILS empty; skipping git commits")
+        return []
+    rows = []
+    since_dt = parse_iso_local(SINCE+"T00:00:00")
+    until_dt = parse_iso_local(UNTIL+"T23:59:59")
+    repos = list(find_git_repos(REPOS_ROOT))
+    if not repos:
+        return rows
+    # git log is subprocess-bound, so threads are enough to overlap the per-repo runs
+    with ThreadPoolExecutor(max_workers=min(GIT_JOBS, len(repos))) as ex:
+        for repo_rows in ex.map(lambda r: _log_one_repo(r, since_dt, until_dt), repos):
+            rows.extend(repo_rows)
+    rows.sort(key=lambda r: r['dt'])
     return rows
 
 # -----------------------------
 # BITBUCKET PRS
 # -----------------------------
-def http_get(url, auth=None, params=None):
-    if params:
-        from urllib.parse import urlencode
-        url = f"{url}?{urlencode(params)}"
-    headers = {}
-    if auth:
-        user, pwd = auth
-        import base64 as b64
-        creds = b64.b64encode(f"{user}:{pwd}".encode()).decode()
-        headers["Authorization"] = f"Basic {creds}"
-    req = urllib.request.Request(url, headers=headers)
-    with urllib.request.urlopen(req) as resp:
-        import json as _json
-        return _json.loads(resp.read().decode())
+def http_get_keepalive(conn, url, headers):
+    # GET over an already-open HTTPSConnection so paginated calls reuse one TCP+TLS session
+    for hop in range(2):
+        parts = urllib.parse.urlsplit(url)
+        if parts.hostname != conn.host:
+            # Never forward the Authorization header to another host
+            raise ValueError(f"Refusing to send credentials to unexpected host: {url}")
+        path = f"{parts.path}?{parts.query}" if parts.query else parts.path
+        for attempt in range(2):
+            try:
+                conn.request("GET", path, headers=headers)
+                resp = conn.getresponse()
+                body = resp.read()
+                break
+            except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+                # Server dropped the idle keep-alive connection; reconnect once
+                conn.close()
+                if attempt:
+                    raise
+        location = resp.getheader("Location")
+        if 300 <= resp.status < 400 and location and not hop:
+            # Follow one redirect (e.g. a renamed repo), as urlopen did
+            url = urllib.parse.urljoin(url, location)
+            continue
+        break
+    if resp.status >= 300:
+        raise urllib.error.HTTPError(url, resp.status, resp.reason, resp.headers, None)
+    return json.loads(body.decode())
+
+def _load_bb_cache(repo):
+    p = BITBUCKET_CACHE_DIR / BITBUCKET_WORKSPACE / f"{repo}.json"
+    if not p.exists():
+        return None
+    try:
+        return json.loads(p.read_text(encoding='utf-8'))
+    except Exception:
+        return None
+
+def _save_bb_cache(repo, data):
+    p = BITBUCKET_CACHE_DIR / BITBUCKET_WORKSPACE / f"{repo}.json"
+    try:
+        p.parent.mkdir(parents=True, exist_ok=True)
+        p.write_text(json.dumps(data, separators=(',', ':')), encoding='utf-8')
+    except Exception as e:
+        print(f"Failed writing Bitbucket cache {p}: {e}")
 
 def collect_bitbucket_prs():
     if not USE_BITBUCKET or not all([BITBUCKET_USER, BITBUCKET_APP_PASSWORD, BITBUCKET_REPO_SLUGS, BITBUCKET_WORKSPACE]):
         return []
     rows = []
-    q = f'state = "MERGED" AND updated_on >= "{SINCE}" AND updated_on <= "{UNTIL}T23:59:59"'
-    auth = (BITBUCKET_USER, BITBUCKET_APP_PASSWORD)
+    creds = base64.b64encode(f"{BITBUCKET_USER}:{BITBUCKET_APP_PASSWORD}".encode()).decode()
+    headers = {"Authorization": f"Basic {creds}"}
+    conn = http.client.HTTPSConnection("api.bitbucket.org", timeout=60)
     for repo in BITBUCKET_REPO_SLUGS:
+        # Merged PRs are immutable, so a cache that already reaches back to SINCE
+        # only needs PRs updated after the newest one it holds
+        cache = _load_bb_cache(repo)
+        cs = cache.get('covered_since') if cache else None
+        if isinstance(cs, str) and cs <= SINCE and cache.get('prs'):
+            prs = {pr['id']: pr for pr in cache['prs']}
+            covered_since = cs
+            lower = f'updated_on > "{max(pr["updated_on"] for pr in prs.values())}"'
+        else:
+            prs = {}
+            covered_since = SINCE
+            lower = f'updated_on >= "{SINCE}"'
+        q = f'state = "MERGED" AND {lower} AND updated_on <= "{UNTIL}T23:59:59"'
         base = f"https://api.bitbucket.org/2.0/repositories/{BITBUCKET_WORKSPACE}/{repo}/pullrequests"
         url = f"{base}?{urllib.parse.urlencode({'q': q, 'pagelen': 50})}"
         while url:
-            data = http_get(url, auth=auth)
+            data = http_get_keepalive(conn, url, headers)
             for pr in data.get("values", []):
-                dt = parse_iso_local(pr.get("updated_on") or "")
-                if not dt:
+                if not pr.get("updated_on"):
                     continue
-                rows.append({
-                    "source": "bitbucket_pr",
-                    "repo": repo,
-                    "timestamp_local": dt.isoformat(),
-                    "detail": f"PR #{pr.get('id',0)} merged: {pr.get('title','')}",
-                })
+                prs[pr.get('id', 0)] = {
+                    'id': pr.get('id', 0),
+                    'title': pr.get('title', ''),
+                    'updated_on': pr['updated_on'],
+                }
             url = data.get("next")
+        _save_bb_cache(repo, {'covered_since': covered_since, 'prs': list(prs.values())})
+        for pr in prs.values():
+            # Same bounds as the API query, compared on the raw updated_on string
+            if not (SINCE <= pr['updated_on'] <= f"{UNTIL}T23:59:59"):
+                continue
+            dt = parse_iso_local(pr['updated_on'])
+            if not dt:
+                continue
+            rows.append({
+                "source": "bitbucket_pr",
+                "repo": repo,
+                "timestamp_local": dt.isoformat(),
+                "dt": dt,
+                "detail": f"PR #{pr['id']} merged: {pr['title']}",
+            })
+    conn.close()
+    rows.sort(key=lambda r: r['dt'])
     return rows
 
 # -----------------------------
 # CALENDAR (ICS ONLY)
 # -----------------------------
+ICS_PROP_RE = re.compile(r"^(DTSTART|DTEND|SUMMARY)((?:;[^:]*)?):(.*)$")
+ICS_TZID_RE = re.compile(r";TZID=\"?([^;\":]+)\"?")
+
+def _unfold_ics_lines(f):
+    # RFC 5545 folding: continuation lines start with a space or tab
+    current = None
+    for raw in f:
+        line = raw.rstrip("\r\n")
+        if line[:1] in (" ", "\t") and current is not None:
+            current += line[1:]
+            continue
+        if current is not None:
+            yield current
+        current = line
+    if current is not None:
+        yield current
+
+@lru_cache(maxsize=64)
+def _ics_zone(tzid):
+    try:
+        return ZoneInfo(tzid)
+    except Exception:
+        return TZ
+
+def _parse_ics_datetime(params: str, value: str):
+    value = value.strip()
+    if "VALUE=DATE" in params.upper() and "VALUE=DATE-TIME" not in params.upper():
+        return None  # all-day
+    try:
+        if value.endswith("Z"):
+            return datetime.strptime(value, "%Y%m%dT%H%M%SZ").replace(tzinfo=timezone.utc)
+        dt = datetime.strptime(value, "%Y%m%dT%H%M%S")
+    except ValueError:
+        return None  # date-only or malformed
+    m = ICS_TZID_RE.search(params)
+    return dt.replace(tzinfo=_ics_zone(m.group(1)) if m else TZ)
+
+def _unescape_ics_text(value: str):
+    return (value.replace("\\N", "\n").replace("\\n", "\n")
+            .replace("\\,", ",").replace("\\;", ";").replace("\\\\", "\\"))
+
 def collect_calendar_events():
     rows = []
     if not GOOGLE_CALENDAR_ICS or not os.path.exists(GOOGLE_CALENDAR_ICS):
         return rows
-    try:
-        from icalendar import Calendar
-    except ImportError:
-        print("icalendar not installed; skipping ICS events")
-        return rows
-    try:
-        with open(GOOGLE_CALENDAR_ICS, 'r', encoding='utf-8') as f:
-            cal_text = f.read()
-        cal = Calendar.from_ical(cal_text)
-    except Exception as e:
-        print(f"Failed to parse ICS file: {e}")
-        return rows
+
+    since_date = datetime.fromisoformat(SINCE).date()
+    until_date = datetime.fromisoformat(UNTIL).date()
 
     def add_event(s: datetime, e: datetime, title: str):
         if e <= s:
             return
-        since_date = datetime.fromisoformat(SINCE).date()
-        until_date = datetime.fromisoformat(UNTIL).date()
         if s.date() > until_date or e.date() < since_date:
             return
         rows.append({
             "source": "calendar",
             "repo": "",
             "timestamp_local": s.isoformat(),
+            "dt": s,
             "start": s,
             "end": e,
             "detail": f"Meeting: {title}",
         })
 
-    for component in cal.walk():
-        if component.name != 'VEVENT':
-            continue
-        try:
-            dtstart_field = component.get('dtstart')
-            dtend_field = component.get('dtend')
-            summary = str(component.get('summary') or '(no title)')
-        except Exception:
-            continue
-        if not dtstart_field or not dtend_field:
-            continue
-        dtstart = dtstart_field.dt
-        dtend = dtend_field.dt
-        if not isinstance(dtstart, datetime) or not isinstance(dtend, datetime):
-            continue  # skip all-day
-        if dtstart.tzinfo is None:
-            dtstart = dtstart.replace(tzinfo=ZoneInfo(LOCAL_TZ))
-        if dtend.tzinfo is None:
-            dtend = dtend.replace(tzinfo=ZoneInfo(LOCAL_TZ))
-        s = to_local(dtstart)
-        e = to_local(dtend)
-        if summary.strip().lower() in EXCLUDED_CALENDAR_TITLES:
-            continue
-        add_event(s, e, summary)
+    # Stream VEVENT blocks line by line instead of building the full calendar tree
+    try:
+        with open(GOOGLE_CALENDAR_ICS, 'r', encoding='utf-8') as f:
+            in_event = False
+            nested = 0
+            props = {}
+            for line in _unfold_ics_lines(f):
+                if line == "BEGIN:VEVENT":
+                    in_event, nested, props = True, 0, {}
+                    continue
+                if not in_event:
+                    continue
+                if line == "END:VEVENT":
+                    in_event = False
+                    if 'DTSTART' not in props or 'DTEND' not in props:
+                        continue
+                    dtstart = _parse_ics_datetime(*props['DTSTART'])
+                    dtend = _parse_ics_datetime(*props['DTEND'])
+                    if not dtstart or not dtend:
+                        continue  # skip all-day
+                    summary = _unescape_ics_text(props['SUMMARY'][1]) if 'SUMMARY' in props else '(no title)'
+                    if summary.strip().lower() in EXCLUDED_CALENDAR_TITLES:
+                        continue
+                    add_event(to_local(dtstart), to_local(dtend), summary)
+                    continue
+                # Skip properties of sub-components such as VALARM
+                if line.startswith("BEGIN:"):
+                    nested += 1
+                    continue
+                if line.startswith("END:"):
+                    nested = max(0, nested - 1)
+                    continue
+                if nested:
+                    continue
+                m = ICS_PROP_RE.match(line)
+                if m and m.group(1) not in props:
+                    props[m.group(1)] = (m.group(2), m.group(3))
+    except Exception as e:
+        print(f"Failed to parse ICS file: {e}")
+        return rows
+    rows.sort(key=lambda r: r['dt'])
     return rows
 
 # -----------------------------
@@ -421,93 +612,136 @@ def collect_slack_messages_search():
 
     rows = []
 
-    def cache_path(uid):
-        return SLACK_CACHE_DIR / f"search_user_{uid}.json"
+    def cache_path(uid, legacy=False):
+        return SLACK_CACHE_DIR / (f"search_user_{uid}.json" if legacy else f"search_user_{uid}.json.gz")
 
     def load_cache(uid):
         if not SLACK_CACHE_ENABLED:
             return None
+        # Prefer the gzip cache; fall back to the uncompressed one older versions wrote
         p = cache_path(uid)
-        if not p.exists():
-            return None
         try:
-            with p.open('r', encoding='utf-8') as f:
-                return json.load(f)
+            if p.exists():
+                with gzip.open(p, 'rb') as f:
+                    raw = f.read()
+            elif cache_path(uid, legacy=True).exists():
+                raw = cache_path(uid, legacy=True).read_bytes()
+            else:
+                return None
+            data = orjson.loads(raw) if orjson else json.loads(raw.decode('utf-8'))
         except Exception:
             return None
+        # raw_messages are (ts, text, channel) rows; older caches stored dicts
+        data['raw_messages'] = [
+            (m['ts'], m.get('text',''), m.get('channel','search')) if isinstance(m, dict) else tuple(m)
+            for m in data.get('raw_messages', [])
+        ]
+        return data
 
     def save_cache(uid, data):
         if not SLACK_CACHE_ENABLED:
             return
         p = cache_path(uid)
+        tmp = p.with_name(p.name + '.tmp')
         try:
-            with p.open('w', encoding='utf-8') as f:
-                json.dump(data, f, indent=1)
+            payload = orjson.dumps(data) if orjson else json.dumps(data, separators=(',', ':')).encode('utf-8')
+            with gzip.open(tmp, 'wb', compresslevel=3) as f:
+                f.write(payload)
+            # Atomic swap so an interrupted run never leaves a half-written cache
+            os.replace(tmp, p)
+            cache_path(uid, legacy=True).unlink(missing_ok=True)
         except Exception as e:
             print(f"Failed writing search cache {p}: {e}")
 
-    for uid in SLACK_USER_IDS:
+    def _fetch_range(uid, lo_ts, hi_ts):
+        # Returns (messages, complete); complete is False if any slice was aborted
+        messages = []
+        complete = True
+        start_date = datetime.fromtimestamp(lo_ts).date()
+        end_date = datetime.fromtimestamp(hi_ts).date()
+        slice_days = 90
+        current = start_date
+        while current <= end_date:
+            slice_end = min(end_date, current + timedelta(days=slice_days-1))
+            q = f"from:<@{uid}> after:{current.isoformat()} before:{(slice_end + timedelta(days=1)).isoformat()}"
+            cursor = None
+            attempts = 0
+            while True:
+                try:
+                    resp = client.search_messages(query=q, sort='timestamp', sort_dir='asc', count=100, cursor=cursor)
+                    attempts = 0
+                except SlackApiError as e:
+                    err = e.response.get('error') if hasattr(e,'response') else str(e)
+                    if err == 'ratelimited':
+                        retry_after = int(e.response.headers.get('Retry-After','5')) if hasattr(e.response,'headers') else 5
+                        time_module.sleep(retry_after + random.uniform(0,1))
+                        continue
+                    attempts += 1
+                    if attempts > 5:
+                        print(f"search abort uid={uid} slice {current}->{slice_end}: {err}")
+                        complete = False
+                        break
+                    backoff = min(30, 2 ** (attempts-1))
+                    time_module.sleep(backoff + random.uniform(0,0.5))
+                    continue
+                matches = resp.get('messages', {}).get('matches', [])
+                for m in matches:
+                    ts_str = m.get('ts') or m.get('message', {}).get('ts')
+                    if not ts_str:
+                        continue
+                    try:
+                        ts_f = float(ts_str)
+                    except Exception:
+                        continue
+                    if not (lo_ts <= ts_f <= hi_ts):
+                        continue
+                    channel_info = m.get('channel', {})
+                    ch_name = channel_info.get('name') or channel_info.get('id') or 'unknown'
+                    text = (m.get('text') or m.get('message', {}).get('text') or '').strip()
+                    messages.append((ts_str, text, ch_name))
+                cursor = resp.get('response_metadata', {}).get('next_cursor') or None
+                if not cursor:
+                    break
+            current = slice_end + timedelta(days=1)
+        return messages, complete
+
+    def _search_user(uid):
+        user_rows = []
         cache = None if SLACK_FORCE_REFRESH else load_cache(uid)
-        need_fetch = True
+        messages_accum = []
+        cs = cu = None
         if cache:
             cs = cache.get('covered_since')
             cu = cache.get('covered_until')
-            if isinstance(cs,(int,float)) and isinstance(cu,(int,float)) and cs <= oldest_ts and cu >= latest_ts:
-                need_fetch = False
-        messages_accum = [] if need_fetch else cache.get('raw_messages', [])
-        if need_fetch:
-            start_date = datetime.fromisoformat(SINCE).date()
-            end_date = datetime.fromisoformat(UNTIL).date()
-            slice_days = 14
-            current = start_date
-            while current <= end_date:
-                slice_end = min(end_date, current + timedelta(days=slice_days-1))
-                q = f"from:<@{uid}> after:{current.isoformat()} before:{(slice_end + timedelta(days=1)).isoformat()}"
-                cursor = None
-                attempts = 0
-                while True:
-                    try:
-                        resp = client.search_messages(query=q, sort='timestamp', sort_dir='asc', count=100, cursor=cursor)
-                        attempts = 0
-                    except SlackApiError as e:
-                        err = e.response.get('error') if hasattr(e,'response') else str(e)
-                        if err == 'ratelimited':
-                            retry_after = int(e.response.headers.get('Retry-After','5')) if hasattr(e.response,'headers') else 5
-                            time_module.sleep(retry_after + random.uniform(0,1))
-                            continue
-                        attempts += 1
-                        if attempts > 5:
-                            print(f"search abort uid={uid} slice {current}->{slice_end}: {err}")
-                            break
-                        backoff = min(30, 2 ** (attempts-1))
-                        time_module.sleep(backoff + random.uniform(0,0.5))
-                        continue
-                    matches = resp.get('messages', {}).get('matches', [])
-                    for m in matches:
-                        ts_str = m.get('ts') or m.get('message', {}).get('ts')
-                        if not ts_str:
-                            continue
-                        try:
-                            ts_f = float(ts_str)
-                        except Exception:
-                            continue
-                        if not (oldest_ts <= ts_f <= latest_ts):
-                            continue
-                        channel_info = m.get('channel', {})
-                        ch_name = channel_info.get('name') or channel_info.get('id') or 'unknown'
-                        text = (m.get('text') or m.get('message', {}).get('text') or '').strip()
-                        messages_accum.append({'ts': ts_str, 'text': text, 'channel': ch_name})
-                    cursor = resp.get('response_metadata', {}).get('next_cursor') or None
-                    if not cursor:
-                        break
-                current = slice_end + timedelta(days=1)
-            dedup = {m['ts']: m for m in messages_accum}
+            if isinstance(cs,(int,float)) and isinstance(cu,(int,float)) and cs <= cu:
+                messages_accum = list(cache.get('raw_messages', []))
+            else:
+                cs = cu = None
+        # Only fetch the parts of [oldest_ts, latest_ts] the cache doesn't cover yet
+        if cs is None:
+            fetch_ranges = [(oldest_ts, latest_ts)]
+        else:
+            fetch_ranges = []
+            if oldest_ts < cs:
+                fetch_ranges.append((oldest_ts, cs))
+            if latest_ts > cu:
+                fetch_ranges.append((cu, latest_ts))
+        if fetch_ranges:
+            fetch_started_ts = time_module.time()
+            complete = True
+            for lo_ts, hi_ts in fetch_ranges:
+                fetched, ok = _fetch_range(uid, lo_ts, hi_ts)
+                messages_accum.extend(fetched)
+                complete = complete and ok
+            dedup = {m[0]: m for m in messages_accum}
             messages_accum = list(dedup.values())
-            if messages_accum:
-                cov_since = min(float(m['ts']) for m in messages_accum)
-                cov_until = max(float(m['ts']) for m in messages_accum)
+            if complete:
+                cov_since = oldest_ts if cs is None else min(cs, oldest_ts)
+                # Messages can't exist past the fetch start, so leave that part uncovered
+                searched_until = min(latest_ts, fetch_started_ts)
+                cov_until = searched_until if cu is None else max(cu, searched_until)
             else:
-                cov_since, cov_until = oldest_ts, latest_ts
+                cov_since, cov_until = cs, cu
             save_cache(uid, {
                 'user_id': uid,
                 'raw_messages': messages_accum,
@@ -516,121 +750,120 @@ def collect_slack_messages_search():
                 'last_fetched': datetime.now().isoformat(),
                 'mode': 'search'
             })
-        for m in messages_accum:
+        for ts_str, text, ch_name in messages_accum:
             try:
-                ts_float = float(m['ts'])
+                ts_float = float(ts_str)
             except Exception:
                 continue
             if not (oldest_ts <= ts_float <= latest_ts):
                 continue
             dt_utc = datetime.fromtimestamp(ts_float, tz=timezone.utc)
             dt_local = to_local(dt_utc)
-            text = m.get('text','')
             snippet = (text[:60] + '...') if len(text) > 63 else text
-            ch_name = m.get('channel','search')
-            rows.append({
+            user_rows.append({
                 'source': 'slack',
                 'repo': ch_name,
                 'timestamp_local': dt_local.isoformat(),
+                'dt': dt_local,
                 'detail': f"msg in #{ch_name}: {snippet}",
             })
+        return user_rows
+
+    # Each user's search is network-bound; run them concurrently on the shared client
+    with ThreadPoolExecutor(max_workers=min(8, len(SLACK_USER_IDS))) as ex:
+        for per_user in ex.map(_search_user, SLACK_USER_IDS):
+            rows.extend(per_user)
+    rows.sort(key=lambda r: r['dt'])
     return rows
 
 # -----------------------------
 # OVERTIME CALC
 # -----------------------------
-def calendar_outside_intervals(rows_from_calendar):
-    intervals = []
-    for r in rows_from_calendar:
-        intervals.extend(intersect_interval_with_outside(r['start'], r['end']))
-    return merge_intervals(intervals)
-
 def compute_overtime(commits, prs, calendar, slack_msgs):
-    commit_times = [parse_iso_local(r['timestamp_local']) for r in commits]
-    pr_times = [parse_iso_local(r['timestamp_local']) for r in prs]
-    slack_times = [parse_iso_local(r['timestamp_local']) for r in slack_msgs]
-    sessions = sessions_from_points([t for t in commit_times + pr_times + slack_times if t])
-
-    outside_sessions = []
-    for s,e in sessions:
-        outside_sessions.extend(intersect_interval_with_outside(s,e))
-    outside_sessions = merge_intervals(outside_sessions)
-
-    cal_intervals = calendar_outside_intervals([
-        {"start": r['start'], "end": r['end'], "title": r['detail']} for r in calendar
-    ])
-
-    all_intervals = merge_intervals(outside_sessions + cal_intervals)
+    sessions = sessions_from_points([r['dt'] for r in commits + prs + slack_msgs])
+
+    # Build the outside-work timeline once for the whole span, then sweep each interval over it
+    spans = sessions + [(r['start'], r['end']) for r in calendar]
+    timeline = None
+    if spans:
+        timeline = outside_timeline(min(s.date() for s,_ in spans), max(e.date() for _,e in spans))
+
+    # Collect every outside-work fragment from sessions and calendar events; merge (and sort) once
+    fragments = []
+    for s,e in spans:
+        fragments.extend(intersect_interval_with_outside(s, e, timeline))
+    all_intervals = merge_intervals(fragments)
     per_day = defaultdict(lambda: {"minutes": 0, "notes": []})
     for s,e in all_intervals:
         per_day[s.date().isoformat()]["minutes"] += int((e - s).total_seconds() // 60)
 
-    for r in sorted(commits + prs + calendar + slack_msgs, key=lambda x: x['timestamp_local']):
-        day = datetime.fromisoformat(r['timestamp_local']).date().isoformat()
-        if len(per_day[day]['notes']) < 5:
-            per_day[day]['notes'].append(f"[{r['source']}] {r['detail']}")
+    # Collectors return rows sorted by dt, so a lazy merge replaces re-sorting the union;
+    # grouping by day lets each day stop after its first 5 notes
+    merged = heapq.merge(commits, prs, calendar, slack_msgs, key=lambda x: x['dt'])
+    for day, day_rows in groupby(merged, key=lambda x: x['dt'].date().isoformat()):
+        notes = per_day[day]['notes']
+        notes.extend(f"[{r['source']}] {r['detail']}" for r in islice(day_rows, 5 - len(notes)))
 
     # Lunch gap heuristic (+60 if no 60m free inside normal windows)
     LUNCH_MINUTES = 60
-    event_days = set(datetime.fromisoformat(r['timestamp_local']).date() for r in commits + prs + slack_msgs)
-    event_days.update(r['start'].date() for r in calendar)
+    event_days = {r['dt'].date() for r in chain(commits, prs, slack_msgs)} | {r['start'].date() for r in calendar}
     event_days.update(datetime.fromisoformat(d).date() for d in per_day.keys())
 
-    def inside_work_intervals_for_date(d):
-        windows = day_work_windows(d)
-        tz = ZoneInfo(LOCAL_TZ)
-        return [(datetime.combine(d, s, tzinfo=tz), datetime.combine(d, e, tzinfo=tz)) for s,e in windows]
+    DAY_SECONDS = 24 * 3600
+    LUNCH_RUN = b"\x00" * (LUNCH_MINUTES * 60)
+    # Flooring starts and ceiling ends can shrink a gap by just under 2s, so runs this close
+    # to LUNCH_RUN are re-checked exactly
+    NEAR_LUNCH_RUN = LUNCH_RUN[:-2]
 
-    for d in sorted(event_days):
-        if not day_work_windows(d):
-            continue
-        inside_windows = inside_work_intervals_for_date(d)
-        if not inside_windows:
-            continue
-        occupied = []
-        for s,e in sessions:
-            if s.date() <= d <= e.date():
-                day_start = datetime.combine(d, time(0,0), tzinfo=s.tzinfo)
-                day_end = datetime.combine(d, time(23,59,59), tzinfo=s.tzinfo)
-                seg_s = max(s, day_start)
-                seg_e = min(e, day_end)
-                if seg_s < seg_e:
-                    for iw_s, iw_e in inside_windows:
-                        cs = max(seg_s, iw_s)
-                        ce = min(seg_e, iw_e)
-                        if cs < ce:
-                            occupied.append((cs, ce))
-        for r in calendar:
-            s = r['start']
-            e = r['end']
-            if s.date() <= d <= e.date():
-                day_start = datetime.combine(d, time(0,0), tzinfo=s.tzinfo)
-                day_end = datetime.combine(d, time(23,59,59), tzinfo=s.tzinfo)
-                seg_s = max(s, day_start)
-                seg_e = min(e, day_end)
-                if seg_s < seg_e:
-                    for iw_s, iw_e in inside_windows:
-                        cs = max(seg_s, iw_s)
-                        ce = min(seg_e, iw_e)
-                        if cs < ce:
-                            occupied.append((cs, ce))
-        if not occupied:
-            continue
-        occupied = merge_intervals(occupied)
-        free = []
-        for iw_s, iw_e in inside_windows:
+    def _mark_occupied(occ, d, s, e):
+        # Clip [s, e) to day d and flag its seconds; start floors, end ceils
+        if not (s.date() <= d <= e.date()):
+            return
+        a = 0 if s.date() < d else s.hour * 3600 + s.minute * 60 + s.second
+        b = DAY_SECONDS if e.date() > d else e.hour * 3600 + e.minute * 60 + e.second + (1 if e.microsecond else 0)
+        if a < b:
+            occ[a:b] = b"\x01" * (b - a)
+
+    def _exact_lunch_gap(d, windows, events):
+        # Datetime interval arithmetic for the rare borderline day
+        inside = [(datetime.combine(d, ws, tzinfo=TZ), datetime.combine(d, we, tzinfo=TZ)) for ws, we in windows]
+        occupied = merge_intervals([
+            (max(s, iw_s), min(e, iw_e)) for s,e in events for iw_s, iw_e in inside if max(s, iw_s) < min(e, iw_e)
+        ])
+        for iw_s, iw_e in inside:
             cursor = iw_s
             for os_s, os_e in occupied:
                 if os_e <= cursor or os_s >= iw_e:
                     continue
-                if cursor < os_s:
-                    free.append((cursor, os_s))
+                if (os_s - cursor).total_seconds() >= LUNCH_MINUTES*60:
+                    return True
                 cursor = max(cursor, os_e)
-                if cursor >= iw_e:
-                    break
-            if cursor < iw_e:
-                free.append((cursor, iw_e))
-        has_lunch_gap = any((iv[1]-iv[0]).total_seconds() >= LUNCH_MINUTES*60 for iv in free)
+            if (iw_e - cursor).total_seconds() >= LUNCH_MINUTES*60:
+                return True
+        return False
+
+    # Bucket sessions and calendar events by every date they touch, in one pass
+    events_by_date = defaultdict(list)
+    for s,e in chain(sessions, ((r['start'], r['end']) for r in calendar)):
+        day = s.date()
+        while day <= e.date():
+            events_by_date[day].append((s,e))
+            day += timedelta(days=1)
+
+    for d in sorted(event_days):
+        windows = day_work_windows(d)
+        if not windows:
+            continue
+        inside_windows = [(ws.hour * 3600 + ws.minute * 60, we.hour * 3600 + we.minute * 60) for ws, we in windows]
+        # One byte per second of the day; slice assignment and find run at C speed
+        occ = bytearray(DAY_SECONDS)
+        for s,e in events_by_date.get(d, ()):
+            _mark_occupied(occ, d, s, e)
+        if all(occ.find(1, iw_s, iw_e) == -1 for iw_s, iw_e in inside_windows):
+            continue
+        has_lunch_gap = any(occ.find(LUNCH_RUN, iw_s, iw_e) != -1 for iw_s, iw_e in inside_windows)
+        if not has_lunch_gap and any(occ.find(NEAR_LUNCH_RUN, iw_s, iw_e) != -1 for iw_s, iw_e in inside_windows):
+            has_lunch_gap = _exact_lunch_gap(d, windows, events_by_date[d])
         if not has_lunch_gap:
             key = d.isoformat()
             _ = per_day[key]
@@ -666,28 +899,24 @@ def main():
     all_rows = commits + prs + calendar_events + slack_msgs
     all_rows.sort(key=lambda r: r['timestamp_local'])
 
+    rows_out = [
+        (r['dt'].date().isoformat(), r['dt'].strftime('%H:%M:%S'), r['dt'].strftime('%a'), r['source'], r['repo'], r['detail'])
+        for r in all_rows
+    ]
     with open(OUT_COMMITS_CSV, 'w', newline='', encoding='utf-8') as f:
         w = csv.writer(f)
         w.writerow(["date", "time", "weekday", "source", "repo_or_channel", "detail"])
-        for r in all_rows:
-            dt = datetime.fromisoformat(r['timestamp_local'])
-            w.writerow([
-                dt.date().isoformat(),
-                dt.time().isoformat(timespec='seconds'),
-                dt.strftime('%a'),
-                r['source'],
-                r['repo'],
-                r['detail']
-            ])
+        w.writerows(rows_out)
 
     per_day = compute_overtime(commits, prs, calendar_events, slack_msgs)
+    summary_out = [
+        (day, datetime.fromisoformat(day).strftime('%a'), f"{v['minutes']/60:.2f}", "; ".join(v['notes'][:5]))
+        for day, v in sorted(per_day.items())
+    ]
     with open(OUT_SUMMARY_CSV, 'w', newline='', encoding='utf-8') as f:
         w = csv.writer(f)
         w.writerow(["date", "weekday", "hours_extra_estimated", "examples"])
-        for day in sorted(per_day.keys()):
-            d = datetime.fromisoformat(day)
-            mins = per_day[day]['minutes']
-            w.writerow([day, d.strftime('%a'), f"{mins/60:.2f}", "; ".join(per_day[day]['notes'][:5])])
+        w.writerows(summary_out)
     total_minutes = sum(v['minutes'] for v in per_day.values())
     total_hours = total_minutes / 60.0 if total_minutes else 0.0
     hh = int(total_minutes // 60)